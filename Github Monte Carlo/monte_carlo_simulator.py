@@ -4,13 +4,73 @@ Herramienta de propósito general para simulaciones Monte Carlo
 Autor: Diseñado para análisis estadístico flexible
 """
 
+import bisect
+import functools
+import keyword
+import math
+import re
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-import scipy.stats as stats
+
+try:
+    import numexpr
+except ImportError:  # numexpr es opcional
+    numexpr = None
+
+try:
+    import numba
+except ImportError:  # numba es opcional
+    numba = None
+
+# Identificadores dentro de una fórmula y funciones matemáticas permitidas
+_IDENT_RE = re.compile(r'\b[a-zA-Z_]\w*\b')
+_ALLOWED_FUNCS = frozenset({'sqrt', 'exp', 'log', 'sin', 'cos', 'tan', 'abs', 'min', 'max', 'pow'})
+_NO_NUMEXPR = frozenset({'min', 'max', 'pow'})
+
+# Espera (ms) tras la última tecla antes de recalcular evaluador/estimador
+DEBOUNCE_MS = 150
+
+# A partir de este número de simulaciones se usa el kernel paralelo de numba
+UMBRAL_JIT_PARALELO = 100_000
+
+# Número de barras del histograma de resultados
+N_BINS_HISTOGRAMA = 50
+
+# Número de intervalos de la tabla de la CDF usada por el evaluador de metas
+N_BINS_CDF = 4096
+
+# Plantilla del panel de estadísticas (se rellena con Resultados.estadisticas())
+_STATS_TEMPLATE = """
+╔══════════════════════════════════════════════════════════════╗
+║              ESTADÍSTICAS DE LA SIMULACIÓN                   ║
+╚══════════════════════════════════════════════════════════════╝
+
+  Medidas de Tendencia Central:
+  ─────────────────────────────────────
+  • Media:                {media:>20,.4f}
+  • Mediana:              {mediana:>20,.4f}
+
+  Medidas de Dispersión:
+  ─────────────────────────────────────
+  • Desviación Estándar:  {desviacion:>20,.4f}
+  • Mínimo:               {minimo:>20,.4f}
+  • Máximo:               {maximo:>20,.4f}
+
+  Percentiles:
+  ─────────────────────────────────────
+  • Percentil 2.5:        {percentil_2_5:>20,.4f}
+  • Percentil 25 (Q1):    {percentil_25:>20,.4f}
+  • Percentil 75 (Q3):    {percentil_75:>20,.4f}
+  • Percentil 97.5:       {percentil_97_5:>20,.4f}
+
+  Intervalo de Confianza 95%:
+  ─────────────────────────────────────
+  [{percentil_2_5:,.4f}  -  {percentil_97_5:,.4f}]
+"""
 
 
 class Variable:
@@ -36,45 +96,98 @@ class Variable:
         if self.distribucion not in distribuciones_validas:
             raise ValueError(f"Distribución '{self.distribucion}' no soportada. Use: {distribuciones_validas}")
     
-    def generar_muestra(self, n):
+    def generar_muestra(self, n, rng=None, out=None):
         """
         Genera n valores aleatorios según la distribución
         
         Args:
             n (int): Número de valores a generar
+            rng (numpy.random.Generator): Generador a utilizar (si es None se crea uno nuevo)
+            out (numpy.array): Array float64 o float32 de tamaño n donde escribir los valores (opcional)
             
         Returns:
             numpy.array: Array con los valores generados
         """
+        if rng is None:
+            rng = np.random.default_rng()
+        if out is None:
+            out = np.empty(n, dtype=np.float64)
+        
         if self.distribucion == 'normal':
             mu = self.parametros['media']
             sigma = self.parametros['desviacion']
-            return np.random.normal(mu, sigma, n)
+            rng.standard_normal(out=out, dtype=out.dtype)
+            out *= sigma
+            out += mu
         
         elif self.distribucion == 'uniforme':
             minimo = self.parametros['minimo']
             maximo = self.parametros['maximo']
-            return np.random.uniform(minimo, maximo, n)
+            rng.random(out=out, dtype=out.dtype)
+            out *= (maximo - minimo)
+            out += minimo
         
         elif self.distribucion == 'triangular':
             minimo = self.parametros['minimo']
             moda = self.parametros['moda']
             maximo = self.parametros['maximo']
-            return np.random.triangular(minimo, moda, maximo, n)
+            out[...] = rng.triangular(minimo, moda, maximo, n)
         
         elif self.distribucion == 'lognormal':
             mu = self.parametros['media_log']
             sigma = self.parametros['desviacion_log']
-            return np.random.lognormal(mu, sigma, n)
+            rng.standard_normal(out=out, dtype=out.dtype)
+            out *= sigma
+            out += mu
+            np.exp(out, out=out)
         
         elif self.distribucion == 'binomial':
-            n_trials = self.parametros['n']
+            n_trials = int(self.parametros['n'])
             p = self.parametros['p']
-            return np.random.binomial(n_trials, p, n)
+            out[...] = rng.binomial(n_trials, p, n)
         
         elif self.distribucion == 'poisson':
             lam = self.parametros['lambda']
-            return np.random.poisson(lam, n)
+            out[...] = rng.poisson(lam, n)
+        
+        return out
+
+
+def _sin_out(ufunc, nombre):
+    """
+    Envuelve un ufunc para que acepte exactamente sus operandos, como la
+    función de Python equivalente (numpy tomaría un argumento extra como out
+    y sobrescribiría las muestras de otra variable)
+    """
+    def funcion(*args):
+        if len(args) != ufunc.nin:
+            raise TypeError(f"{nombre}() espera {ufunc.nin} argumento(s), recibió {len(args)}")
+        return ufunc(*args)
+    return funcion
+
+
+def _reducir(ufunc, nombre):
+    """Envuelve np.minimum/np.maximum para aceptar dos o más argumentos, como min()/max()"""
+    def funcion(*args):
+        if len(args) < 2:
+            raise TypeError(f"{nombre}() espera al menos 2 argumentos, recibió {len(args)}")
+        return functools.reduce(ufunc, args)
+    return funcion
+
+
+# Funciones disponibles en las fórmulas evaluadas sobre arrays
+_FUNCIONES_VECTORIZADAS = {
+    'sqrt': _sin_out(np.sqrt, 'sqrt'),
+    'exp': _sin_out(np.exp, 'exp'),
+    'log': _sin_out(np.log, 'log'),
+    'sin': _sin_out(np.sin, 'sin'),
+    'cos': _sin_out(np.cos, 'cos'),
+    'tan': _sin_out(np.tan, 'tan'),
+    'abs': _sin_out(np.abs, 'abs'),
+    'min': _reducir(np.minimum, 'min'),
+    'max': _reducir(np.maximum, 'max'),
+    'pow': _sin_out(np.power, 'pow'),
+}
 
 
 class Modelo:
@@ -82,75 +195,206 @@ class Modelo:
     Define la relación entre variables mediante una fórmula
     """
     
-    def __init__(self, formula, variables):
+    def __init__(self, formula, variables, engine='numpy'):
         """
         Args:
             formula (str): Fórmula que relaciona las variables (ej: "x + y * 2")
             variables (dict): Diccionario de objetos Variable {nombre: Variable}
+            engine (str): Motor de evaluación ('numpy' o 'numexpr')
         """
         self.formula = formula
         self.variables = variables
+        self.engine = engine
+        self._validar_engine()
         self._validar_formula()
+        self._code = self._compilar_formula()
+        # numexpr interpreta min/max como reducciones y no tiene pow: esas fórmulas van por eval
+        self._usar_numexpr = (self.engine == 'numexpr'
+                              and _NO_NUMEXPR.isdisjoint(_IDENT_RE.findall(self.formula)))
+    
+    def _validar_engine(self):
+        """Valida que el motor de evaluación sea soportado y esté disponible"""
+        engines_validos = ['numpy', 'numexpr']
+        if self.engine not in engines_validos:
+            raise ValueError(f"Motor '{self.engine}' no soportado. Use: {engines_validos}")
+        if self.engine == 'numexpr' and numexpr is None:
+            raise ValueError("El motor 'numexpr' requiere instalar el paquete numexpr")
     
     def _validar_formula(self):
         """Valida que la fórmula use solo variables definidas"""
         # Extraer nombres de variables en la fórmula
-        import re
-        nombres_en_formula = re.findall(r'\b[a-zA-Z_]\w*\b', self.formula)
+        nombres_en_formula = _IDENT_RE.findall(self.formula)
         
         # Filtrar funciones matemáticas comunes
-        funciones_permitidas = {'sqrt', 'exp', 'log', 'sin', 'cos', 'tan', 'abs', 'min', 'max', 'pow'}
-        nombres_en_formula = [n for n in nombres_en_formula if n not in funciones_permitidas]
+        nombres_en_formula = [n for n in nombres_en_formula if n not in _ALLOWED_FUNCS]
         
         # Verificar que todas las variables existan
         for nombre in nombres_en_formula:
             if nombre not in self.variables:
                 raise ValueError(f"Variable '{nombre}' en la fórmula no está definida")
     
+    def _compilar_formula(self):
+        """Compila la fórmula una sola vez para no re-parsearla en cada evaluación"""
+        try:
+            return compile(self.formula, '<formula>', 'eval')
+        except SyntaxError as e:
+            raise ValueError(f"Error de sintaxis en la fórmula: {e.msg}")
+    
     def evaluar(self, valores_variables):
         """
         Evalúa la fórmula con valores específicos de las variables
         
+        Los valores pueden ser escalares o arrays de numpy; en el segundo caso
+        la fórmula se evalúa de forma vectorizada sobre todos los elementos.
+        
         Args:
-            valores_variables (dict): Diccionario {nombre_variable: valor}
+            valores_variables (dict): Diccionario {nombre_variable: valor o array}
             
         Returns:
-            float: Resultado de evaluar la fórmula
+            numpy.ndarray: Resultado de evaluar la fórmula
         """
+        # numexpr fusiona las operaciones en una sola pasada sobre los arrays
+        if self._usar_numexpr:
+            try:
+                return np.asarray(numexpr.evaluate(self.formula, local_dict=valores_variables,
+                                                         global_dict={}))
+            except Exception:
+                pass
+        
         # Crear namespace seguro con funciones matemáticas y variables
-        namespace = {
-            'sqrt': np.sqrt,
-            'exp': np.exp,
-            'log': np.log,
-            'sin': np.sin,
-            'cos': np.cos,
-            'tan': np.tan,
-            'abs': abs,
-            'min': min,
-            'max': max,
-            'pow': pow,
-            **valores_variables
-        }
+        namespace = {**_FUNCIONES_VECTORIZADAS, **valores_variables}
         
         try:
-            return eval(self.formula, {"__builtins__": {}}, namespace)
+            return np.asarray(eval(self._code, {"__builtins__": {}}, namespace))
         except Exception as e:
             raise ValueError(f"Error al evaluar la fórmula: {e}")
 
 
+# Funciones disponibles dentro de las fórmulas compiladas con numba
+_JIT_FUNCIONES = {
+    'sqrt': math.sqrt,
+    'exp': math.exp,
+    'log': math.log,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'pow': pow,
+}
+
+_jit_cache = {}  # {(formula, nombres_variables): función compilada o None}
+_jit_kernel_cache = {}  # {(formula, nombres_variables): kernel paralelo o None}
+
+
+def _get_jit_func(formula, var_names):
+    """
+    Devuelve la fórmula compilada con numba como función escalar de las variables
+    
+    Args:
+        formula (str): Fórmula a compilar
+        var_names (tuple): Nombres de las variables, en el orden de los argumentos
+        
+    Returns:
+        Función compilada f(*valores) -> float, o None si numba no está
+        disponible o la fórmula no se puede compilar
+    """
+    if numba is None:
+        return None
+    
+    clave = (formula, tuple(var_names))
+    if clave not in _jit_cache:
+        _jit_cache[clave] = _compilar_jit(formula, clave[1])
+    return _jit_cache[clave]
+
+
+def _compilar_jit(formula, var_names):
+    """Genera y compila con numba la función escalar de la fórmula"""
+    if not all(nombre.isidentifier() and not keyword.iskeyword(nombre) for nombre in var_names):
+        return None
+    
+    try:
+        code = compile(formula, '<formula>', 'eval')
+    except SyntaxError:
+        return None
+    
+    # Solo se permiten variables y funciones matemáticas conocidas
+    if not set(code.co_names) <= set(_JIT_FUNCIONES) | set(var_names):
+        return None
+    
+    src = f"def _f({', '.join(var_names)}):\n    return {formula}\n"
+    namespace = dict(_JIT_FUNCIONES)
+    
+    # Firma explícita: compila en este momento y los errores de tipado se detectan aquí
+    firma = numba.float64(*([numba.float64] * len(var_names)))
+    try:
+        exec(src, namespace)
+        return numba.njit(firma)(namespace['_f'])
+    except Exception:
+        return None
+
+
+def _get_jit_kernel(formula, var_names):
+    """
+    Devuelve un kernel paralelo de numba que evalúa la fórmula elemento a elemento
+    
+    Args:
+        formula (str): Fórmula a compilar
+        var_names (tuple): Nombres de las variables, en el orden de las filas de muestras
+        
+    Returns:
+        Función kernel(muestras, out) que escribe en out[i] el resultado de la
+        simulación i a partir de muestras[:, i], o None si no está disponible
+    """
+    clave = (formula, tuple(var_names))
+    if clave not in _jit_kernel_cache:
+        funcion_jit = _get_jit_func(formula, clave[1])
+        _jit_kernel_cache[clave] = None if funcion_jit is None else _compilar_kernel(funcion_jit, len(clave[1]))
+    return _jit_kernel_cache[clave]
+
+
+def _compilar_kernel(funcion_jit, n_variables):
+    """Genera y compila con numba el bucle paralelo sobre las simulaciones"""
+    argumentos = ', '.join(f"muestras[{j}, i]" for j in range(n_variables))
+    src = (
+        "def _kernel(muestras, out):\n"
+        "    for i in prange(out.shape[0]):\n"
+        f"        out[i] = _f({argumentos})\n"
+    )
+    namespace = {'_f': funcion_jit, 'prange': numba.prange}
+    exec(src, namespace)
+    
+    # Sin firma: numba compila una versión por dtype (float32/float64) en la primera llamada
+    return numba.njit(parallel=True)(namespace['_kernel'])
+
+
 class Simulador:
     """
     Motor principal que ejecuta las simulaciones Monte Carlo
     """
     
-    def __init__(self, modelo, n_simulaciones=10000):
+    def __init__(self, modelo, n_simulaciones=10000, dtype=np.float64):
         """
         Args:
             modelo (Modelo): Modelo a simular
             n_simulaciones (int): Número de simulaciones a ejecutar
+            dtype: Precisión de muestras y resultados (np.float64 o np.float32; float32
+                usa la mitad de memoria, suficiente para corridas muy grandes)
         """
         self.modelo = modelo
         self.n_simulaciones = n_simulaciones
+        self.dtype = np.dtype(dtype)
+        self._validar_dtype()
+        self.rng = np.random.default_rng()
+        # Buffer de muestras (una fila por variable) reutilizado en cada ejecución
+        self._sample_buf = np.empty((len(modelo.variables), n_simulaciones), dtype=self.dtype)
+    
+    def _validar_dtype(self):
+        """Valida que la precisión sea soportada por el generador aleatorio"""
+        dtypes_validos = [np.dtype(np.float64), np.dtype(np.float32)]
+        if self.dtype not in dtypes_validos:
+            raise ValueError(f"dtype '{self.dtype}' no soportado. Use: {[str(d) for d in dtypes_validos]}")
     
     def ejecutar(self):
         """
@@ -159,21 +403,57 @@ class Simulador:
         Returns:
             Resultados: Objeto con los resultados de las simulaciones
         """
-        resultados_simulaciones = []
-        
-        # Generar muestras para todas las variables
+        # Generar muestras para todas las variables en el buffer contiguo
+        # usando un único generador (sin reservar memoria nueva por variable)
+        buf = self._sample_buf
         muestras_variables = {}
-        for nombre, variable in self.modelo.variables.items():
-            muestras_variables[nombre] = variable.generar_muestra(self.n_simulaciones)
+        for i, (nombre, variable) in enumerate(self.modelo.variables.items()):
+            muestras_variables[nombre] = variable.generar_muestra(self.n_simulaciones, self.rng, out=buf[i])
+        
+        # Para corridas grandes se usa el kernel paralelo de numba si la fórmula compila
+        if self.n_simulaciones > UMBRAL_JIT_PARALELO:
+            kernel = _get_jit_kernel(self.modelo.formula, tuple(self.modelo.variables))
+            if kernel is not None:
+                resultado = np.empty(self.n_simulaciones, dtype=self.dtype)
+                try:
+                    kernel(buf, resultado)
+                    return Resultados(resultado)
+                except Exception:
+                    pass  # p. ej. división por cero: se repite con numpy
+        
+        # Evaluar el modelo sobre todas las simulaciones a la vez (vectorizado)
+        try:
+            resultado = self.modelo.evaluar(muestras_variables)
+        except ValueError:
+            # Fórmulas que no admiten arrays (p. ej. comparaciones encadenadas "0 < x < 10")
+            resultado = self._evaluar_escalar(muestras_variables)
         
-        # Evaluar el modelo para cada simulación
-        for i in range(self.n_simulaciones):
-            valores_actuales = {nombre: muestras_variables[nombre][i] 
-                              for nombre in self.modelo.variables.keys()}
-            resultado = self.modelo.evaluar(valores_actuales)
-            resultados_simulaciones.append(resultado)
+        # Si la fórmula no depende de las variables el resultado es un escalar;
+        # broadcast_to lo expande sin copiar y astype solo copia si cambia el tipo
+        resultado = np.broadcast_to(resultado, (self.n_simulaciones,)).astype(self.dtype, copy=False)
+        
+        # Una fórmula como "x" devuelve una vista del buffer, que se sobrescribe en la siguiente ejecución
+        if np.shares_memory(resultado, buf):
+            resultado = resultado.copy()
+        
+        return Resultados(resultado)
+    
+    def _evaluar_escalar(self, muestras_variables):
+        """
+        Evalúa el modelo simulación por simulación (compatibilidad con fórmulas no vectorizables)
         
-        return Resultados(np.array(resultados_simulaciones))
+        Args:
+            muestras_variables (dict): Diccionario {nombre_variable: array de muestras}
+            
+        Returns:
+            numpy.array: Resultado de cada simulación
+        """
+        nombres = tuple(muestras_variables)
+        columnas = [muestras_variables[nombre] for nombre in nombres]
+        resultado = np.empty(self.n_simulaciones, dtype=self.dtype)
+        for i in range(self.n_simulaciones):
+            resultado[i] = self.modelo.evaluar({nombre: columna[i] for nombre, columna in zip(nombres, columnas)})
+        return resultado
 
 
 class Resultados:
@@ -187,43 +467,179 @@ class Resultados:
             datos (numpy.array): Array con los resultados de todas las simulaciones
         """
         self.datos = datos
+        self._sorted = np.sort(datos, axis=None)
+        self._tiene_nan = bool(np.isnan(self._sorted[-1]))
+        self._stats = self._calcular_estadisticas()
+        
+        # Tabla de la CDF sobre [mínimo, máximo]: cantidad de datos < y <= cada borde.
+        # Se compara en float64 (como percentile_of) aunque los datos sean float32
+        self._cdf_min = float(self._sorted[0])
+        self._cdf_max = float(self._sorted[-1])
+        self._cdf_valida = bool(np.isfinite(self._cdf_max - self._cdf_min))
+        if self._cdf_valida:
+            self._cdf_escala = N_BINS_CDF / (self._cdf_max - self._cdf_min) if self._cdf_max > self._cdf_min else 0.0
+            ordenados = self._sorted.astype(np.float64, copy=False)
+            edges = np.linspace(self._cdf_min, self._cdf_max, N_BINS_CDF + 1)
+            # Como listas: indexar escalares sueltos es más rápido que en un array de numpy
+            self._cdf_edges = edges.tolist()
+            self._cdf_menores = np.searchsorted(ordenados, edges, side='left').tolist()
+            self._cdf_menores_o_iguales = np.searchsorted(ordenados, edges, side='right').tolist()
+    
+    def percentile_of(self, y):
+        """
+        Calcula el percentil de un valor dentro de la distribución de resultados
+        
+        Args:
+            y (float): Valor a ubicar
+            
+        Returns:
+            float: Percentil de y con el mismo criterio de empates que
+                scipy.stats.percentileofscore (kind='rank', rango promedio);
+                NaN si y o algún resultado es NaN
+        """
+        if self._tiene_nan or np.isnan(y):
+            return np.nan
+        
+        menores = np.searchsorted(self._sorted, y, side='left')
+        menores_o_iguales = np.searchsorted(self._sorted, y, side='right')
+        return 50.0 * (menores + menores_o_iguales + (menores_o_iguales > menores)) / self._sorted.size
+    
+    def percentile_lut(self, y):
+        """
+        Calcula el percentil de un valor usando la tabla de la CDF: el intervalo
+        de y se obtiene en O(1) y solo se busca dentro de ese intervalo
+        
+        Args:
+            y (float): Valor a ubicar
+            
+        Returns:
+            float: Percentil de y (igual que percentile_of)
+        """
+        # Con NaN o valores infinitos no hay intervalos de ancho finito
+        if not self._cdf_valida:
+            return self.percentile_of(y)
+        
+        y = np.float64(y)  # bisect compararía en float32 contra datos float32
+        if np.isnan(y):
+            return np.nan
+        if y < self._cdf_min:
+            return 0.0
+        if y > self._cdf_max:
+            return 100.0
+        
+        posicion = (y - self._cdf_min) * self._cdf_escala
+        idx = min(int(posicion), N_BINS_CDF - 1)
+        # Corregir redondeos para que edges[idx] <= y <= edges[idx + 1]
+        while idx > 0 and self._cdf_edges[idx] > y:
+            idx -= 1
+        while self._cdf_edges[idx + 1] < y:
+            idx += 1
+        
+        # Los datos antes del intervalo son < y (o <= y); todos desde fin son > y
+        fin = self._cdf_menores_o_iguales[idx + 1]
+        menores = bisect.bisect_left(self._sorted, y, self._cdf_menores[idx], fin)
+        menores_o_iguales = bisect.bisect_right(self._sorted, y, self._cdf_menores_o_iguales[idx], fin)
+        return 50.0 * (menores + menores_o_iguales + (menores_o_iguales > menores)) / self._sorted.size
     
     def estadisticas(self):
         """
-        Calcula estadísticas descriptivas
+        Devuelve las estadísticas descriptivas (calculadas una sola vez al crear el objeto)
         
         Returns:
             dict: Diccionario con estadísticas
         """
-        return {
+        return self._stats
+    
+    def _calcular_estadisticas(self):
+        """Calcula las estadísticas descriptivas de los datos"""
+        # Percentiles, mínimo y máximo se leen del array ya ordenado
+        p_2_5, p_25, mediana, p_75, p_97_5 = self._percentiles([2.5, 25, 50, 75, 97.5])
+        stats_dict = {
             'media': np.mean(self.datos),
-            'mediana': np.median(self.datos),
+            'mediana': mediana,
             'desviacion': np.std(self.datos),
-            'minimo': np.min(self.datos),
-            'maximo': np.max(self.datos),
-            'percentil_2_5': np.percentile(self.datos, 2.5),
-            'percentil_25': np.percentile(self.datos, 25),
-            'percentil_75': np.percentile(self.datos, 75),
-            'percentil_97_5': np.percentile(self.datos, 97.5)
+            'minimo': self._sorted[0],
+            'maximo': self._sorted[-1],
+            'percentil_2_5': p_2_5,
+            'percentil_25': p_25,
+            'percentil_75': p_75,
+            'percentil_97_5': p_97_5
         }
+        
+        # np.sort deja los NaN al final, así que lo leído del array ordenado saldría de
+        # una distribución truncada; como np.percentile, con NaN todo es NaN
+        if self._tiene_nan:
+            return dict.fromkeys(stats_dict, np.nan)
+        return stats_dict
+    
+    def _percentiles(self, qs):
+        """
+        Calcula varios percentiles sobre la copia ordenada (interpolación lineal,
+        igual que np.percentile) sin volver a particionar los datos
+        
+        Args:
+            qs (list): Percentiles a calcular, entre 0 y 100
+            
+        Returns:
+            numpy.array: Valores de los percentiles en el mismo orden
+        """
+        posiciones = np.asarray(qs, dtype=np.float64) / 100 * (self._sorted.size - 1)
+        inferior = np.floor(posiciones).astype(np.intp)
+        superior = np.ceil(posiciones).astype(np.intp)
+        fraccion = posiciones - inferior
+        bajo = self._sorted[inferior]
+        alto = self._sorted[superior]
+        # Si ambos vecinos son iguales no se interpola: con ±inf daría inf - inf = nan
+        with np.errstate(invalid='ignore'):
+            return np.where(bajo == alto, bajo, bajo + (alto - bajo) * fraccion)
     
-    def graficar(self, ax):
+    def graficar(self, ax, stats_dict=None, artistas=None):
         """
         Genera histograma de resultados
         
         Args:
             ax: Axes de matplotlib donde graficar
+            stats_dict (dict): Estadísticas a mostrar (por defecto las de estadisticas())
+            artistas (dict): Artistas devueltos por una llamada anterior sobre el mismo ax;
+                si se indican se actualizan en lugar de reconstruir el gráfico
+            
+        Returns:
+            dict: Artistas del gráfico {'barras', 'media', 'ic_inferior', 'ic_superior'}
         """
+        if stats_dict is None:
+            stats_dict = self._stats
+        
+        # Como ax.hist, se ignoran los valores no finitos (NaN, ±inf)
+        finitos = self.datos[np.isfinite(self.datos)]
+        counts, edges = np.histogram(finitos, bins=N_BINS_HISTOGRAMA, density=True)
+        etiqueta_media = f"Media: {stats_dict['media']:.2f}"
+        
+        if artistas is not None:
+            for rect, x, ancho, altura in zip(artistas['barras'], edges[:-1], np.diff(edges), counts):
+                rect.set_x(x)
+                rect.set_width(ancho)
+                rect.set_height(altura)
+            artistas['media'].set_xdata([stats_dict['media'], stats_dict['media']])
+            artistas['media'].set_label(etiqueta_media)
+            artistas['ic_inferior'].set_xdata([stats_dict['percentil_2_5'], stats_dict['percentil_2_5']])
+            artistas['ic_superior'].set_xdata([stats_dict['percentil_97_5'], stats_dict['percentil_97_5']])
+            ax.relim()
+            ax.autoscale_view()
+            ax.legend()
+            return artistas
+        
         ax.clear()
-        ax.hist(self.datos, bins=50, density=True, alpha=0.7, color='steelblue', edgecolor='black')
-        ax.axvline(np.mean(self.datos), color='red', linestyle='--', linewidth=2, label=f'Media: {np.mean(self.datos):.2f}')
-        ax.axvline(np.percentile(self.datos, 2.5), color='orange', linestyle=':', linewidth=1.5, label='IC 95%')
-        ax.axvline(np.percentile(self.datos, 97.5), color='orange', linestyle=':', linewidth=1.5)
+        barras = ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', alpha=0.7, color='steelblue', edgecolor='black')
+        media = ax.axvline(stats_dict['media'], color='red', linestyle='--', linewidth=2, label=etiqueta_media)
+        ic_inferior = ax.axvline(stats_dict['percentil_2_5'], color='orange', linestyle=':', linewidth=1.5, label='IC 95%')
+        ic_superior = ax.axvline(stats_dict['percentil_97_5'], color='orange', linestyle=':', linewidth=1.5)
         ax.set_xlabel('Valor')
         ax.set_ylabel('Densidad de Probabilidad')
         ax.set_title('Distribución de Resultados - Simulación Monte Carlo')
         ax.legend()
         ax.grid(True, alpha=0.3)
+        
+        return {'barras': barras, 'media': media, 'ic_inferior': ic_inferior, 'ic_superior': ic_superior}
 
 
 class AplicacionMonteCarlo:
@@ -239,6 +655,26 @@ class AplicacionMonteCarlo:
         # Variables de control
         self.variables = {}  # {nombre: Variable}
         self.resultados = None
+        self._formula_compilada = (None, None)  # (texto, code) para el estimador
+        self._pending_eval = None  # id de root.after pendiente del evaluador
+        self._pending_estimador = None  # id de root.after pendiente del estimador
+        self._artistas_grafico = None  # barras y líneas del histograma, reutilizadas entre simulaciones
+        self._simulador_actual = (None, None)  # (clave, Simulador) reutilizado entre simulaciones
+        
+        # Namespace de funciones matemáticas del estimador (se construye una sola vez)
+        self._math_ns = {
+            'sqrt': np.sqrt,
+            'exp': np.exp,
+            'log': np.log,
+            'sin': np.sin,
+            'cos': np.cos,
+            'tan': np.tan,
+            'abs': abs,
+            'min': min,
+            'max': max,
+            'pow': pow,
+            '__builtins__': {}
+        }
         
         # Configurar el layout principal
         self._crear_interfaz()
@@ -534,11 +970,8 @@ class AplicacionMonteCarlo:
             return
         
         try:
-            # Crear modelo
-            modelo = Modelo(formula, self.variables)
-            
             # Ejecutar simulación
-            simulador = Simulador(modelo, n_sim)
+            simulador = self._obtener_simulador(formula, n_sim)
             self.resultados = simulador.ejecutar()
             
             # Mostrar resultados
@@ -549,45 +982,35 @@ class AplicacionMonteCarlo:
         except Exception as e:
             messagebox.showerror("Error", f"Error en la simulación:\n{e}")
     
+    def _obtener_simulador(self, formula, n_sim):
+        """
+        Devuelve el simulador de la corrida anterior si la fórmula, las variables y
+        el número de simulaciones no cambiaron (reutiliza su buffer de muestras y
+        su generador); si no, crea uno nuevo
+        """
+        # Las Variable no se modifican tras crearse: se comparan por identidad
+        clave = (formula, n_sim, tuple(self.variables.items()))
+        clave_anterior, simulador = self._simulador_actual
+        if clave != clave_anterior:
+            # Copia del diccionario: el modelo no debe cambiar al agregar/eliminar variables
+            modelo = Modelo(formula, dict(self.variables))
+            simulador = Simulador(modelo, n_sim)
+            self._simulador_actual = (clave, simulador)
+        return simulador
+    
     def _mostrar_resultados(self):
         """Muestra los resultados gráficos y estadísticos"""
         if self.resultados is None:
             return
         
-        # Graficar
-        self.resultados.graficar(self.ax)
-        self.canvas.draw()
-        
-        # Mostrar estadísticas
         stats_dict = self.resultados.estadisticas()
         
-        texto = f"""
-╔══════════════════════════════════════════════════════════════╗
-║              ESTADÍSTICAS DE LA SIMULACIÓN                   ║
-╚══════════════════════════════════════════════════════════════╝
-
-  Medidas de Tendencia Central:
-  ─────────────────────────────────────
-  • Media:                {stats_dict['media']:>20,.4f}
-  • Mediana:              {stats_dict['mediana']:>20,.4f}
-
-  Medidas de Dispersión:
-  ─────────────────────────────────────
-  • Desviación Estándar:  {stats_dict['desviacion']:>20,.4f}
-  • Mínimo:               {stats_dict['minimo']:>20,.4f}
-  • Máximo:               {stats_dict['maximo']:>20,.4f}
-
-  Percentiles:
-  ─────────────────────────────────────
-  • Percentil 2.5:        {stats_dict['percentil_2_5']:>20,.4f}
-  • Percentil 25 (Q1):    {stats_dict['percentil_25']:>20,.4f}
-  • Percentil 75 (Q3):    {stats_dict['percentil_75']:>20,.4f}
-  • Percentil 97.5:       {stats_dict['percentil_97_5']:>20,.4f}
-
-  Intervalo de Confianza 95%:
-  ─────────────────────────────────────
-  [{stats_dict['percentil_2_5']:,.4f}  -  {stats_dict['percentil_97_5']:,.4f}]
-"""
+        # Graficar (reutilizando los artistas de la simulación anterior)
+        self._artistas_grafico = self.resultados.graficar(self.ax, stats_dict, self._artistas_grafico)
+        self.canvas.draw_idle()
+        
+        # Mostrar estadísticas
+        texto = _STATS_TEMPLATE.format_map(stats_dict)
         
         self.texto_estadisticas.config(state='normal')
         self.texto_estadisticas.delete("1.0", tk.END)
@@ -595,7 +1018,14 @@ class AplicacionMonteCarlo:
         self.texto_estadisticas.config(state='disabled')
     
     def _actualizar_evaluador(self, event=None):
+        """Programa la actualización del evaluador, descartando la pendiente (debounce)"""
+        if self._pending_eval is not None:
+            self.root.after_cancel(self._pending_eval)
+        self._pending_eval = self.root.after(DEBOUNCE_MS, self._calcular_evaluador)
+    
+    def _calcular_evaluador(self):
         """Actualiza el evaluador de metas en tiempo real"""
+        self._pending_eval = None
         if self.resultados is None:
             return
         
@@ -608,7 +1038,7 @@ class AplicacionMonteCarlo:
             valor_y = float(valor_y)
             
             # Calcular percentil del valor Y en la distribución de resultados
-            percentil = stats.percentileofscore(self.resultados.datos, valor_y)
+            percentil = self.resultados.percentile_lut(valor_y)
             probabilidad = 100 - percentil  # Probabilidad de alcanzar o superar
             
             # Formatear mensaje
@@ -627,8 +1057,23 @@ class AplicacionMonteCarlo:
         except ValueError:
             self.meta_resultado_label.config(text="→ Ingrese un número válido", foreground="gray")
     
+    def _compilar_formula_estimador(self, formula):
+        """Devuelve la fórmula compilada, recompilando solo si el texto cambió"""
+        texto, code = self._formula_compilada
+        if texto != formula:
+            code = compile(formula, '<formula>', 'eval')
+            self._formula_compilada = (formula, code)
+        return code
+    
     def _actualizar_estimador(self, event=None):
+        """Programa la actualización del estimador, descartando la pendiente (debounce)"""
+        if self._pending_estimador is not None:
+            self.root.after_cancel(self._pending_estimador)
+        self._pending_estimador = self.root.after(DEBOUNCE_MS, self._calcular_estimador)
+    
+    def _calcular_estimador(self):
         """Actualiza el estimador de resultados en tiempo real"""
+        self._pending_estimador = None
         if self.resultados is None:
             return
         
@@ -652,25 +1097,16 @@ class AplicacionMonteCarlo:
             # Obtener el nombre de la primera variable (asumiendo es la X)
             nombre_var = list(self.variables.keys())[0]
             
-            # Evaluar la fórmula con el valor de X
-            namespace = {
-                'sqrt': np.sqrt,
-                'exp': np.exp,
-                'log': np.log,
-                'sin': np.sin,
-                'cos': np.cos,
-                'tan': np.tan,
-                'abs': abs,
-                'min': min,
-                'max': max,
-                'pow': pow,
-                nombre_var: valor_x
-            }
-            
-            valor_y = eval(formula, {"__builtins__": {}}, namespace)
+            # Evaluar la fórmula con el valor de X (compilada con numba si está disponible)
+            funcion_jit = _get_jit_func(formula, (nombre_var,))
+            if funcion_jit is not None:
+                valor_y = funcion_jit(valor_x)
+            else:
+                # Globals constantes (funciones) y solo la variable X como locals
+                valor_y = eval(self._compilar_formula_estimador(formula), self._math_ns, {nombre_var: valor_x})
             
             # Calcular en qué percentil de la distribución cae ese Y
-            percentil = stats.percentileofscore(self.resultados.datos, valor_y)
+            percentil = self.resultados.percentile_of(valor_y)
             
             # Formatear el valor Y para mostrarlo
             if abs(valor_y) >= 1_000_000_000: